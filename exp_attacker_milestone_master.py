@@ -1,9 +1,25 @@
-import os
+import multiprocessing
+import subprocess
+from multiprocessing.pool import ThreadPool
 
+def run_experiment(args):
+    """Runs a single milestone experiment, writing its output to `filename`."""
+    cmd, filename = args
+    with open(filename, 'w') as fout:
+        return subprocess.call(cmd, stdout=fout)
+
+experiments = []
 for attacker_name in ["Random", "Average", "Neighbor"]:
     for graph_name in ["Movielens", "BeerAdvocate"]:
         for percent_fake_entities in [0.01, 0.03, 0.05]:
             for fake_reviews in [1, 2, 3, 4, 5]:
                 filename = '-'.join([attacker_name, graph_name, str(percent_fake_entities), str(fake_reviews)])
-                cmd = ' '.join(["python", "exp_attacker_milestone.py", graph_name, str(percent_fake_entities), str(fake_reviews), attacker_name])
-                os.system(cmd + " > " + filename)
+                cmd = ["python", "exp_attacker_milestone.py", graph_name, str(percent_fake_entities), str(fake_reviews), attacker_name]
+                experiments.append((cmd, filename))
+
+# Each experiment is an independent, CPU-bound subprocess, so threads are
+# enough to keep every core busy.
+pool = ThreadPool(multiprocessing.cpu_count())
+pool.map(run_experiment, experiments)
+pool.close()
+pool.join()
@@ -28,8 +28,8 @@ class BaseAttacker(object):
         except:
             graph = self.recommender._G
             degrees = {}
-            for item_id in graph.get_items():
-                degrees[item_id] = len(graph.get_neighbors(item_id))
+            for item_id in graph.iter_items():
+                degrees[item_id] = len(graph.get_neighbors_by_id(item_id))
             np.save(name + '-item-degrees.npy', degrees)
             return degrees
 
@@ -103,10 +103,10 @@ class NeighborAttacker(BaseAttacker):
     def attack(self, verbose = False):
         graph = self.recommender._G
         fake_entities = [self.add_fake_entity() for i in range(self.num_fake_entities)]
-        target_reviewers = graph.get_neighbors(self.target_item)
+        target_reviewers = graph.get_neighbors_by_id(self.target_item)
         also_reviewed = set()
         for reviewer in target_reviewers:
-            also_reviewed |= set(graph.get_neighbors(reviewer))
+            also_reviewed |= set(graph.get_neighbors_by_id(reviewer))
 
         also_reviewed -= set([self.target_item])
 
@@ -170,8 +170,8 @@ class HillClimbingAttacker(BaseAttacker):
         seen = set()
         chosen = []
         neighbors = {}
-        for item_id in network.get_items():
-            neighbors[item_id] = set(network.get_neighbors(item_id) + [item_id])
+        for item_id in network.iter_items():
+            neighbors[item_id] = set(network.get_neighbors_by_id(item_id) + [item_id])
         del neighbors[self.target_item]
         while True: # exits when all nodes are seen
             intersects = Counter({item_id : len(neighbors[item_id] - seen) for item_id in neighbors})
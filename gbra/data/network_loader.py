@@ -5,10 +5,11 @@ Classes and routines for loading SNAP networks
 import abc
 import os
 import snap
-import random
 import numpy as np
+from itertools import izip, repeat
 
 from gbra.util.ei_graph import EIGraph
+from gbra.util.math_utils import sample_bernoulli_indices
 
 class NetworkLoader(object):
     """Override this base class. Implement `load()` to return an EIGraph."""
@@ -66,6 +67,8 @@ class ErdosRenyiLoader(NetworkLoader):
         :param - num_edges: the number of edges desired.
         :param - graph_to_emulate: will sample the weight of each edge from
           the distribution of edge weights in this graph.
+        :param - verbose: if true, prints how many edges were sampled once
+          the graph is loaded.
         """
         if num_edges > num_entities * num_items:
             raise ValueError("More edges requested than possible.")
@@ -101,29 +104,65 @@ class ErdosRenyiLoader(NetworkLoader):
 
 
     def load(self):
-        # TODO: this will take a long time if num_edges is close
-        # to num_items/num_entities. If we need to make graphs like this in
-        # the future, please update my logic :)
-        graph = EIGraph(num_entities=self.num_entities, num_items=self.num_items)
+        """Samples the edges of the graph over the flattened (entity, item)
+        pair space with `sample_bernoulli_indices`, so that the running time
+        is O(num_entities + num_edges) regardless of how dense the graph is.
+
+        The pairs are oversampled slightly and then cut down to a uniformly
+        random subset, so the resulting graph has exactly `num_edges` edges.
+        """
+        graph = EIGraph(
+            num_entities=self.num_entities, num_items=self.num_items,
+            expected_edges=self.num_edges
+        )
         graph.name = "erdos-renyi"
-        edges_left = self.num_edges
-        while edges_left > 0:
-            entity_node_id = 2 * random.randint(0, self.num_entities - 1) + 1
-            item_node_id = 2 * random.randint(1, self.num_items)
-            if not graph.is_edge(entity_node_id, item_node_id):
-                edges_left -= 1
-                if self.verbose:
-                    print entity_node_id, item_node_id
-
-                edge_weight = 1
-
-                # If we have a ratings distribution, add edges to this ER
-                # graph according to that distribution.
-                if self.ratings_dist:
-                    edge_weight = np.random.choice(
-                        self.possible_ratings, p=self.ratings_dist
-                    )
-                graph.add_edge(entity_node_id, item_node_id, weight=edge_weight)
+
+        num_pairs = self.num_entities * self.num_items
+        if self.num_edges == 0 or num_pairs == 0:
+            return graph
+        # Keep each pair with a probability a few standard deviations above
+        # num_edges / num_pairs, so that fewer than num_edges pairs almost
+        # never come out. Given their count, the sampled pairs are a uniform
+        # subset, and so is any uniform subset of them.
+        p = (self.num_edges + 4 * np.sqrt(self.num_edges) + 1) / num_pairs
+        pair_indices = sample_bernoulli_indices(num_pairs, p)
+        while len(pair_indices) < self.num_edges:
+            pair_indices = sample_bernoulli_indices(num_pairs, p)
+        if len(pair_indices) > self.num_edges:
+            keep = np.random.choice(len(pair_indices), self.num_edges, replace=False)
+            pair_indices = pair_indices[np.sort(keep)]
+
+        # Reserve each node's expected degree so that its neighbor vector is
+        # not grown one edge at a time.
+        G = graph.base()
+        entity_degree = int(np.ceil(float(self.num_edges) / self.num_entities))
+        item_degree = int(np.ceil(float(self.num_edges) / self.num_items))
+        for nid in graph.iter_entities():
+            G.ReserveNIdDeg(nid, entity_degree)
+        for nid in graph.iter_items():
+            G.ReserveNIdDeg(nid, item_degree)
+
+        # Each pair index is sampled at most once, so there is no need
+        # to check whether the edge already exists.
+        entity_node_ids = (2 * (pair_indices // self.num_items) + 1).tolist()
+        item_node_ids = (2 * (pair_indices % self.num_items + 1)).tolist()
+
+        # If we have a ratings distribution, add edges to this ER graph
+        # according to that distribution, drawing every rating at once.
+        if self.ratings_dist:
+            edge_weights = np.random.choice(
+                self.possible_ratings, size=len(pair_indices), p=self.ratings_dist
+            ).tolist()
+        else:
+            edge_weights = repeat(1)
+
+        add_edge = graph.add_edge
+        for entity_node_id, item_node_id, edge_weight in izip(
+                entity_node_ids, item_node_ids, edge_weights):
+            add_edge(entity_node_id, item_node_id, weight=edge_weight)
+
+        if self.verbose:
+            print "Sampled %d edges" % graph.num_edges()
         return graph
 
 class DataFileLoader(NetworkLoader):
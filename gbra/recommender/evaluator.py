@@ -49,12 +49,12 @@ class RecEvaluator(object):
         self._quick_entities = []
 
         # All entities
-        self._entities = recommender._G.get_entities()
+        self._entities = recommender._G.iter_entities()
 
         # Set up the entities to work with if we require "quick" evaluation
         # in our samples.
         for entity in self._entities:
-            neighbors = self._recommender._G.get_neighbors(entity)
+            neighbors = self._recommender._G.get_neighbors_by_id(entity)
             if len(neighbors) > 30:
                 continue
             self._quick_entities.append(entity)
@@ -71,7 +71,7 @@ class RecEvaluator(object):
         """
         G = self._recommender._G
         if neighbors_to_eval is None:
-            neighbors_to_eval = G.get_neighbors(entity_id)
+            neighbors_to_eval = G.get_neighbors_by_id(entity_id)
 
         if len(neighbors_to_eval) < 1:
             # If this neighbor only has a single edge to another item,
@@ -102,7 +102,7 @@ class RecEvaluator(object):
         """Returns the sum of evaluation scores for every single entity
         in the graph, normalized by the number of entities in the graph.
         """
-        return self._evaluate(self._recommender._G.get_entities())
+        return self._evaluate(self._recommender._G.iter_entities())
 
     def evaluate_random_sample(self, entity_sample_size=10, quick=False):
         """Returns the sum of recommender evaluation scores for a certain set
@@ -123,7 +123,7 @@ class RecEvaluator(object):
             entity = np.random.choice(entities_to_work_with)
             assert(entity % 2 == 1)
 
-            neighbors = self._recommender._G.get_neighbors(entity)
+            neighbors = self._recommender._G.get_neighbors_by_id(entity)
 
             # Let's not look at very high degree or very low degree nodes in any case.
             if len(neighbors) > 200 or len(neighbors) < 5:
@@ -140,11 +140,10 @@ class RecEvaluator(object):
         of entities, normalized by the number of entities.
         """
         cumulative_eval_score = 0.0
-        graph_entities = self._recommender._G.get_entities()
         total_evaled = 0
         for entity_id in entity_set:
             assert(entity_id % 2 == 1)
-            neighbors = self._recommender._G.get_neighbors(entity_id)
+            neighbors = self._recommender._G.get_neighbors_by_id(entity_id)
 
             # Only keep this neighbors to which you have an edge with weight
             # greater than the min score threshold.  This is so that we don't
@@ -17,6 +17,7 @@ import numpy as np
 from abc import abstractmethod
 from gbra.util.ei_graph import EIGraph
 from gbra.util.asserts import *
+from gbra.util.walk_utils import HAVE_NUMBA
 from gbra import Rnd
 
 class BaseRecommender(object):
@@ -98,7 +99,7 @@ class RandomRecommender(BaseRecommender):
         if not self._G.has_entity(entity_id):
             raise ValueError("Node with id %d is not in the graph." % entity_id)
 
-        graph_items = tuple(self._G.get_items())
+        graph_items = self._G.iter_items()
         entity_node = self._G.base().GetNI(entity_id)
         entity_neighbors = [
             neighborItem for neighborItem in entity_node.GetOutEdges()
@@ -143,13 +144,8 @@ class PopularItemRecommender(BaseRecommender):
         # i.e., use a min heap for keeping the top k most popular elements.
         popular_items = []
 
-        items = self._G.get_items()
-        for item in items:
-            neighbors = self._G.get_neighbors(item)
-            total_popularity = 0
-            for neighbor in neighbors:
-                total_popularity += self._G.get_edge_weight(item, neighbor)
-            popular_items.append((item, total_popularity))
+        for item in self._G.iter_items():
+            popular_items.append((item, self._G.get_weighted_degree(item)))
 
         self._popular_items = np.array([
             i[0] for i in sorted(
@@ -161,7 +157,7 @@ class PopularItemRecommender(BaseRecommender):
         if not self._G.has_entity(entity_id):
             raise ValueError("Node with id %d is not in the graph." % entity_id)
 
-        graph_items = tuple(self._G.get_items())
+        graph_items = self._G.iter_items()
         entity_node = self._G.base().GetNI(entity_id)
         entity_neighbors = [
             neighborItem for neighborItem in entity_node.GetOutEdges()
@@ -229,6 +225,16 @@ class BasicRandomWalkRecommender(BaseRecommender):
         self._verbose = verbose
         super(BasicRandomWalkRecommender, self).__init__(G)
 
+    def calculate_hit_ratio(self, *args, **kwargs):
+        # The graph does not change while computing the hit ratio, so let the
+        # random walks run on a frozen CSR copy of it when they can be
+        # compiled.
+        if HAVE_NUMBA:
+            self._G.freeze()
+        return super(BasicRandomWalkRecommender, self).calculate_hit_ratio(
+            *args, **kwargs
+        )
+
     def _sample_walk_length(self):
         """Returns the walk length to carry out, based on alpha
         This function is not clarified in Eskombatchai et al, 2017. It is likely
@@ -259,30 +265,22 @@ class BasicRandomWalkRecommender(BaseRecommender):
             print("Starting random walks from entity: %d" % start_entity)
 
         while tot_steps < self._max_steps_in_walk:
-            curr_entity = self._G.base().GetNI(start_entity)
             curr_steps = self._sample_walk_length()
-            walk = [str(start_entity)]
 
             # Let's not go beyond tot_steps.
             curr_steps = min(curr_steps, self._max_steps_in_walk - tot_steps)
 
-            # curr_entity contains SNAP node of the last traversed entity.
-            # curr_item contains the SNAP node of the last traversed item.
-            for step in range(curr_steps):
-                if step != 0:
-                    curr_entity = self._G.get_random_neighbor(curr_item, use_weights=True)
-                    walk.append(str(curr_entity.GetId()))
-
-                curr_item = self._G.get_random_neighbor(curr_entity, use_weights=True)
-                walk.append(str(curr_item.GetId()))
-                curr_item_id = curr_item.GetId()
-
+            # Each step goes from an entity to an item, and every step but
+            # the first starts by going back from the last item to an entity.
+            # The items are thus at the even positions of the walk.
+            walk = self._G.weighted_random_walk(start_entity, 2 * curr_steps - 1)
+            for curr_item_id in walk[::2]:
                 if curr_item_id not in V:
                     V[curr_item_id] = 0
                 V[curr_item_id] += 1
 
             if self._verbose:
-                print(' -> '.join(walk))
+                print(' -> '.join(str(nid) for nid in [start_entity] + walk))
 
             tot_steps += curr_steps
         return V
@@ -357,24 +355,15 @@ class PixieRandomWalkRecommender(BasicRandomWalkRecommender):
         num_high_visited = 0
         while tot_steps < self._max_steps_in_walk \
             and num_high_visited <= self._n_p:
-            curr_entity = self._G.base().GetNI(start_entity)
             curr_steps = self._sample_walk_length()
-            walk = [str(start_entity)]
 
             # Let's not go beyond tot_steps.
             curr_steps = min(curr_steps, self._max_steps_in_walk - tot_steps)
 
-            # curr_entity contains SNAP node of the last traversed entity.
-            # curr_item contains the SNAP node of the last traversed item.
-            for step in range(curr_steps):
-                if step != 0:
-                    curr_entity = self._G.get_random_neighbor(curr_item, use_weights=True)
-                    walk.append(str(curr_entity.GetId()))
-
-                curr_item = self._G.get_random_neighbor(curr_entity, use_weights=True)
-                walk.append(str(curr_item.GetId()))
-                curr_item_id = curr_item.GetId()
-
+            # Items are at the even positions of the walk; see
+            # `_do_basic_random_walk`.
+            walk = self._G.weighted_random_walk(start_entity, 2 * curr_steps - 1)
+            for curr_item_id in walk[::2]:
                 if curr_item_id not in V:
                     V[curr_item_id] = 0
                 V[curr_item_id] += 1
@@ -383,7 +372,7 @@ class PixieRandomWalkRecommender(BasicRandomWalkRecommender):
                     num_high_visited += 1
 
             if self._verbose:
-                print(' -> '.join(walk))
+                print(' -> '.join(str(nid) for nid in [start_entity] + walk))
 
             tot_steps += curr_steps
         return V
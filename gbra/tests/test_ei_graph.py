@@ -1,4 +1,6 @@
 
+import marshal
+import random
 import tempfile
 import unittest
 
@@ -6,6 +8,7 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from gbra.util.ei_graph import EIGraph
+from gbra.util.math_utils import weighted_choice
 
 class TestEIGraph(unittest.TestCase):
 
@@ -22,6 +25,22 @@ class TestEIGraph(unittest.TestCase):
         for e in graph.get_entities():
             self.assertTrue(EIGraph.nid_is_entity(e))
 
+        self.assertEqual(graph.get_entities(), set(range(1, 2 * n_ents, 2)))
+        self.assertEqual(graph.get_items(), set(range(2, 2 * n_items + 1, 2)))
+        self.assertEqual(list(graph.iter_entities()), range(1, 2 * n_ents, 2))
+        self.assertEqual(list(graph.iter_items()), range(2, 2 * n_items + 1, 2))
+        self.assertEqual(graph.add_item(), 2 * n_items + 2)
+        self.assertIn(2 * n_items + 2, graph.get_items())
+        self.assertTrue(graph.has_entity(1))
+        self.assertTrue(graph.has_item(2))
+        for entity_id in [-1, 2]:
+            self.assertRaises(AssertionError, graph.has_entity, entity_id)
+        for item_id in [0, -2, 1]:
+            self.assertRaises(AssertionError, graph.has_item, item_id)
+
+        items = graph.get_random_items(n_items, replace=False, excluding=2)
+        self.assertEqual(set(items), graph.get_items() - set([2]))
+
         graph.add_edge(1, 2)
         self.assertEqual(1, graph.base().GetEdges())
 
@@ -29,6 +48,130 @@ class TestEIGraph(unittest.TestCase):
         self.assertEqual(2, graph.get_edge_weight(1, 4))
         self.assertEqual(2, graph.get_edge_weight(4, 1))
 
+    def test_edge_weights(self):
+        graph = EIGraph(2, 3)
+        graph.add_edge(1, 2, weight=3)
+        graph.add_edge(1, 4, weight=0)
+        graph.add_edge(3, 6, weight=5)
+        self.assertEqual(3, graph.get_edge_weight(2, 1))
+        self.assertEqual(8, graph.get_weighted_degree(1) + graph.get_weighted_degree(3))
+
+        graph.del_edge(1, 2)
+        graph.add_edge(1, 2, weight=4)
+        graph.add_edge(3, 2, weight=1)
+        self.assertEqual(4, graph.get_edge_weight(1, 2))
+        self.assertEqual(1, graph.get_edge_weight(2, 3))
+        self.assertEqual(5, graph.get_edge_weight(3, 6))
+        self.assertEqual(2.5, graph.get_average_edge_weight(2))
+        self.assertEqual(4, graph.get_weighted_degree(1))
+        self.assertEqual(6, graph.get_weighted_degree(3))
+        self.assertEqual(0, graph.get_weighted_degree(4))
+
+        # Zero-weight edges are never drawn in a weighted random walk.
+        for _ in xrange(20):
+            self.assertEqual(2, graph.get_random_neighbor(1, use_weights=True).GetId())
+
+        # Cached weights are refreshed once the node's edges change.
+        graph.del_edge(1, 2)
+        graph.add_edge(1, 2, weight=0)
+        graph.del_edge(1, 4)
+        graph.add_edge(1, 4, weight=2)
+        for _ in xrange(20):
+            self.assertEqual(4, graph.get_random_neighbor(1, use_weights=True).GetId())
+
+    def test_random_neighbor(self):
+        graph = EIGraph(2, 3)
+        graph.add_edge(1, 2)
+        graph.add_edge(1, 6)
+        seen = set()
+        for _ in xrange(50):
+            seen.add(graph.get_random_neighbor(1).GetId())
+        self.assertEqual(set([2, 6]), seen)
+        self.assertEqual(1, graph.get_random_neighbor_fast(graph.base().GetNI(6)).GetId())
+        self.assertRaises(ValueError, graph.get_random_neighbor, 3)
+
+    def test_freeze(self):
+        graph = EIGraph(2, 3)
+        graph.add_edge(1, 2, weight=3)
+        graph.add_edge(1, 6, weight=4)
+        graph.add_edge(3, 6, weight=5)
+
+        indptr, indices, weights = graph.freeze()
+        self.assertEqual([2, 6], list(indices[indptr[1]:indptr[2]]))
+        self.assertEqual([1, 3], list(indices[indptr[6]:indptr[7]]))
+        self.assertEqual([4, 5], list(weights[indptr[6]:indptr[7]]))
+        self.assertEqual(indptr[4], indptr[5])
+        self.assertIs(graph.freeze()[0], indptr)
+        self.assertIn(graph.get_random_neighbor_fast(1).GetId(), [2, 6])
+        for _ in xrange(20):
+            self.assertIn(graph.get_random_neighbor(6, use_weights=True).GetId(), [1, 3])
+        self.assertEqual([4, 9], list(graph._cum_weight_cache[6][0]))
+
+        # Any change to the graph drops the snapshot.
+        graph.del_edge(1, 2)
+        self.assertEqual(6, graph.get_random_neighbor_fast(1).GetId())
+        indptr, indices, _ = graph.freeze()
+        self.assertEqual([6], list(indices[indptr[1]:indptr[2]]))
+
+    def test_weighted_random_walk(self):
+        graph = EIGraph(3, 3)
+        graph.add_edge(1, 2, weight=2)
+        graph.add_edge(1, 4, weight=0)
+        graph.add_edge(3, 2, weight=1)
+        graph.add_edge(3, 6, weight=3)
+
+        for freeze in [False, True]:
+            if freeze:
+                graph.freeze()
+            walk = graph.weighted_random_walk(1, 9)
+            self.assertEqual(9, len(walk))
+            for prev, curr in zip([1] + walk, walk):
+                self.assertTrue(graph.is_edge(prev, curr))
+            # The zero-weight edge (1, 4) is never taken.
+            self.assertNotIn(4, walk)
+
+        self.assertRaises(ValueError, graph.weighted_random_walk, 5, 1)
+        # Ids outside the frozen graph are rejected rather than read past
+        # the end of the CSR arrays.
+        for nid in [7, 999999, -1]:
+            self.assertRaises(ValueError, graph.weighted_random_walk, nid, 3)
+
+    def test_negative_weights(self):
+        weights = [3, -2.5, 1, 1]
+        graph = EIGraph(1, 4)
+        for item, weight in zip([2, 4, 6, 8], weights):
+            graph.add_edge(1, item, weight=weight)
+
+        # With these weights, `weighted_choice` always picks the first item,
+        # and so must every weighted draw and walk.
+        for freeze in [False, True]:
+            if freeze:
+                graph.freeze()
+            for _ in xrange(50):
+                self.assertEqual(2, graph.get_random_neighbor(1, use_weights=True).GetId())
+                self.assertEqual([2], graph.weighted_random_walk(1, 1))
+
+        # The draws are the ones `weighted_choice` makes from the same seed.
+        weights = [1, -2, 3, 0.5, -1]
+        graph = EIGraph(1, 5)
+        for item, weight in zip([2, 4, 6, 8, 10], weights):
+            graph.add_edge(1, item, weight=weight)
+        random.seed(0)
+        expected = [weighted_choice([2, 4, 6, 8, 10], weights, sum(weights))
+            for _ in xrange(200)]
+        random.seed(0)
+        actual = [graph.get_random_neighbor(1, use_weights=True).GetId()
+            for _ in xrange(200)]
+        self.assertEqual(expected, actual)
+        self.assertEqual(set([2, 6]), set(actual))
+
+    def test_try_add_edge(self):
+        graph = EIGraph(2, 2)
+        self.assertTrue(graph.try_add_edge(1, 2, weight=3))
+        self.assertFalse(graph.try_add_edge(2, 1, weight=4))
+        self.assertEqual(1, graph.num_edges())
+        self.assertEqual(3, graph.get_edge_weight(1, 2))
+
     def test_save_load(self):
         graph = EIGraph(2, 2)
         graph.add_edge(1, 2)
@@ -46,6 +189,25 @@ class TestEIGraph(unittest.TestCase):
         self.assertTrue(graph.is_edge(3, 2))
         self.assertTrue(graph.base().GetNodes(), 4)
         self.assertEqual(2, graph.get_edge_weight(3, 2))
+        self.assertEqual([1, 2], graph.possible_ratings)
+        self.assertEqual(3, graph.get_weighted_degree(2))
+        self.assertEqual(1, graph.get_weighted_degree(4))
+        self.assertEqual(1.5, graph.get_average_edge_weight(2))
+
+    def test_load_marshal_weights(self):
+        graph = EIGraph(2, 2)
+        graph.add_edge(1, 2)
+        graph.add_edge(3, 4, 5)
+
+        with tempfile.NamedTemporaryFile(delete=True) as temp_f:
+            graph.save(temp_f.name)
+            with open(EIGraph._get_meta_filename(temp_f.name), 'wb') as fout:
+                marshal.dump({(1, 2): 1, (3, 4): 5}, fout)
+            graph = EIGraph.load(temp_f.name)
+
+        self.assertEqual(1, graph.get_edge_weight(1, 2))
+        self.assertEqual(5, graph.get_edge_weight(4, 3))
+        self.assertEqual([1, 5], graph.possible_ratings)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,37 @@
+
+import numpy as np
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+from gbra.util.math_utils import sample_bernoulli_indices
+
+class TestMathUtils(unittest.TestCase):
+
+    def test_sample_bernoulli_indices(self):
+        np.random.seed(0)
+        for n, p in [(1, 0.5), (10, 0.3), (1000, 0.01), (1000, 0.9), (100000, 0.001)]:
+            for _ in xrange(20):
+                indices = sample_bernoulli_indices(n, p)
+                self.assertTrue(np.all(np.diff(indices) > 0))
+                if len(indices):
+                    self.assertGreaterEqual(indices[0], 0)
+                    self.assertLess(indices[-1], n)
+
+    def test_sample_bernoulli_indices_edge_cases(self):
+        self.assertEqual(range(7), sample_bernoulli_indices(7, 1).tolist())
+        self.assertEqual(range(7), sample_bernoulli_indices(7, 1.5).tolist())
+        self.assertEqual(0, len(sample_bernoulli_indices(0, 0.5)))
+        self.assertEqual(0, len(sample_bernoulli_indices(7, 0)))
+
+    def test_sample_bernoulli_indices_mean(self):
+        np.random.seed(0)
+        n, p, trials = 10000, 0.02, 500
+        counts = [len(sample_bernoulli_indices(n, p)) for _ in xrange(trials)]
+        # The mean of `trials` Binomial(n, p) counts has a standard error of
+        # sqrt(n * p * (1 - p) / trials) ~= 0.6.
+        self.assertAlmostEqual(n * p, np.mean(counts), delta=3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+
+import numpy as np
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+from gbra.data.network_loader import ErdosRenyiLoader
+from gbra.util.ei_graph import EIGraph
+
+class TestErdosRenyiLoader(unittest.TestCase):
+
+    def assertValidEdges(self, graph, num_entities, num_items):
+        for edge in graph.base().Edges():
+            nids = [edge.GetSrcNId(), edge.GetDstNId()]
+            [entity] = [nid for nid in nids if EIGraph.nid_is_entity(nid)]
+            [item] = [nid for nid in nids if EIGraph.nid_is_item(nid)]
+            self.assertLessEqual(entity, 2 * num_entities - 1)
+            self.assertLessEqual(item, 2 * num_items)
+
+    def test_load(self):
+        np.random.seed(0)
+        graph = ErdosRenyiLoader(40, 60, 600).load()
+        self.assertEqual(600, graph.num_edges())
+        self.assertEqual(40, graph.num_entities)
+        self.assertEqual(60, graph.num_items)
+        self.assertValidEdges(graph, 40, 60)
+        for edge in graph.base().Edges():
+            self.assertEqual(1, graph.get_edge_weight(edge.GetSrcNId(), edge.GetDstNId()))
+
+        for _ in xrange(20):
+            self.assertEqual(600, ErdosRenyiLoader(40, 60, 600).load().num_edges())
+
+    def test_load_dense(self):
+        graph = ErdosRenyiLoader(5, 7, 35).load()
+        self.assertEqual(35, graph.num_edges())
+        self.assertEqual(34, ErdosRenyiLoader(5, 7, 34).load().num_edges())
+        self.assertValidEdges(graph, 5, 7)
+        self.assertEqual(0, ErdosRenyiLoader(5, 7, 0).load().num_edges())
+        self.assertRaises(ValueError, ErdosRenyiLoader, 5, 7, 36)
+
+    def test_load_emulated(self):
+        to_emulate = EIGraph(2, 2, possible_ratings=[2, 4])
+        to_emulate.add_edge(1, 2, weight=2)
+        to_emulate.add_edge(1, 4, weight=4)
+        to_emulate.add_edge(3, 2, weight=4)
+
+        np.random.seed(0)
+        graph = ErdosRenyiLoader(30, 50, 500, graph_to_emulate=to_emulate).load()
+        self.assertValidEdges(graph, 30, 50)
+        weights = [graph.get_edge_weight(edge.GetSrcNId(), edge.GetDstNId())
+            for edge in graph.base().Edges()]
+        self.assertEqual(set([2, 4]), set(weights))
+        # Ratings follow the emulated graph's distribution: 1/3 are 2s.
+        self.assertAlmostEqual(1. / 3, weights.count(2) / float(len(weights)), delta=0.1)
+
+if __name__ == '__main__':
+    unittest.main()
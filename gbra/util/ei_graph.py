@@ -1,13 +1,23 @@
 """Defines a general-purpose Entity-Item graph object."""
 
 from collections import defaultdict
+from itertools import izip
 import marshal
 import numpy as np
 import random
 import snap
 import numpy as np
 
-from gbra.util.math_utils import weighted_choice
+from gbra.util.walk_utils import HAVE_NUMBA, weighted_walk
+
+# Edges are keyed by the single integer `(entity << 32) | item`, which hashes
+# faster and takes less memory than an (entity, item) tuple. Node ids fit in
+# 32 bits.
+_EDGE_KEY_SHIFT = 32
+_ITEM_MASK = (1 << _EDGE_KEY_SHIFT) - 1
+
+# Every .npz archive is a zip file, which starts with this signature.
+_NPZ_MAGIC = b'PK\x03\x04'
 
 class EIGraph(object):
     """An Entity-Item Graph.
@@ -20,28 +30,62 @@ class EIGraph(object):
 
     In an EIGraph, an entity is an odd-number node (starting at 1)
     and an item is an even-numbered node (starting at 2), in the
-    underlying TUNGraph.
+    underlying TUNGraph. Nodes are never deleted, so the entities are
+    exactly 1, 3, ..., 2 * num_entities - 1 and the items are exactly
+    2, 4, ..., 2 * num_items.
+
+    Edge weights are stored in a numpy array, `_weights_arr`, indexed by the
+    slot that `_edge_id` assigns to each edge key.
+
+    Calling `freeze()` additionally builds a read-only CSR copy of the
+    adjacency for fast random walks; it is dropped whenever the graph changes.
     """
 
     def __init__(self, num_entities=0,
-            num_items=0, rating_range=(0, 5), possible_ratings=[0, 1, 2, 3, 4, 5]):
-        self._G = snap.TUNGraph.New()
-        self.num_entities = 0
-        self.num_items = 0
+            num_items=0, rating_range=(0, 5), possible_ratings=[0, 1, 2, 3, 4, 5],
+            expected_edges=0):
+        """
+        :param - expected_edges: (default 0), the number of edges the graph
+          is expected to hold, used to reserve space up front.
+        """
+        # Reserve space so that bulk insertion does not keep resizing the
+        # node table.
+        self._G = snap.TUNGraph.New(num_entities + num_items, expected_edges)
         self.name = None
-        self.items = []
-        self.entities = []
         self.rating_range = rating_range
         self.possible_ratings = possible_ratings
         self.max_rating = max(self.rating_range)
 
-        for _ in xrange(num_entities):
-            self.add_entity()
-
-        for _ in xrange(num_items):
-            self.add_item()
-
-        self._weights = {}  # (entity, item) -> weight
+        # Entities and items get contiguous ids, so insert them all directly
+        # rather than one `add_entity`/`add_item` call at a time.
+        AddNode = self._G.AddNode
+        for nid in xrange(1, 2 * num_entities, 2):
+            AddNode(nid)
+        for nid in xrange(2, 2 * num_items + 1, 2):
+            AddNode(nid)
+        self.num_entities = num_entities
+        self.num_items = num_items
+
+        self._edge_id = {}  # edge key -> slot in self._weights_arr
+        self._weights_arr = np.empty(1024, dtype=np.float64)
+        self._num_slots = 0
+        self._free_slots = []  # slots released by deleted edges
+
+        # nid -> (running maximum of the cumulative neighbor weights,
+        # neighbors, weighted degree), built lazily by weighted random walks
+        # and dropped whenever the node's edges change.
+        self._cum_weight_cache = {}
+
+        # nid -> sum of the weights of the node's edges, kept up to date by
+        # every edge insertion and deletion.
+        self._weight_sum = defaultdict(float)
+
+        # (indptr, indices, weights) CSR arrays built by `freeze()`, the
+        # cumulative sum of those weights, and its running maximum over each
+        # node's edges.
+        self._csr = None
+        self._csr_cum_weights = None
+        self._csr_max_cum_weights = None
 
     def base(self):
         """Returns the underlying snap TUNGraph."""
@@ -56,7 +100,7 @@ class EIGraph(object):
         new_id = self.num_entities * 2 + 1
         self._G.AddNode(new_id)
         self.num_entities += 1
-        self.entities.append(new_id)
+        self._csr = None
         return new_id
 
     def add_item(self):
@@ -64,30 +108,188 @@ class EIGraph(object):
         new_id = (self.num_items + 1) * 2
         self._G.AddNode(new_id)
         self.num_items += 1
-        self.items.append(new_id)
+        self._csr = None
         return new_id
 
-    def _order_ei(self, nid1, nid2):
-        """Return a tuple (entity, item) from `nid1`, `nid2`."""
-        if self.nid_is_entity(nid2):
-            return nid2, nid1
-        return nid1, nid2
+    def _edge_key(self, nid1, nid2):
+        """Return the flat integer key of the edge between `nid1` and `nid2`."""
+        # Entities are odd, and nid1 ^ nid2 ^ entity is the other endpoint.
+        entity = nid1 if nid1 & 1 else nid2
+        return (entity << _EDGE_KEY_SHIFT) | (nid1 ^ nid2 ^ entity)
+
+    def _alloc_slot(self):
+        """Return a free slot in `_weights_arr`, growing it if needed."""
+        if self._free_slots:
+            return self._free_slots.pop()
+        if self._num_slots == len(self._weights_arr):
+            self._weights_arr = np.concatenate(
+                (self._weights_arr, np.empty_like(self._weights_arr))
+            )
+        self._num_slots += 1
+        return self._num_slots - 1
+
+    def _set_weight(self, nid1, nid2, weight):
+        """Records the weight of the edge just added between `nid1` and
+        `nid2`. Edges are never re-weighted in place.
+        """
+        slot = self._alloc_slot()
+        self._edge_id[self._edge_key(nid1, nid2)] = slot
+        self._weights_arr[slot] = weight
+        self._weight_sum[nid1] += weight
+        self._weight_sum[nid2] += weight
+        self._csr = None
+        self._cum_weight_cache.pop(nid1, None)
+        self._cum_weight_cache.pop(nid2, None)
+
+    def _load_weights(self, entities, items, weights):
+        """Replace all edge weights with the given parallel arrays, where
+        `weights[k]` is the weight of the edge (`entities[k]`, `items[k]`).
+        """
+        keys = (entities.astype(np.int64) << _EDGE_KEY_SHIFT) | items
+        self._edge_id = dict(izip(keys.tolist(), xrange(len(keys))))
+        self._free_slots = []
+        self._num_slots = len(keys)
+        self._weights_arr = np.empty(max(self._num_slots, 1024), dtype=np.float64)
+        self._weights_arr[:self._num_slots] = weights
+        self._cum_weight_cache = {}
+        self._csr = None
+
+        # Every endpoint's weighted degree, in one pass over the edges.
+        endpoints = np.concatenate((entities, items)).astype(np.int64)
+        sums = np.bincount(endpoints, np.concatenate((weights, weights)))
+        nids = np.unique(endpoints)
+        self._weight_sum = defaultdict(float, izip(nids.tolist(), sums[nids].tolist()))
+
+    def _neighbor_weights(self, nid, neighbors):
+        """Returns a numpy array with the weights of the edges between `nid`
+        and each node in `neighbors`.
+        """
+        edge_id = self._edge_id
+        # All edges share the endpoint `nid`, so orient the keys once.
+        if nid & 1:
+            base = nid << _EDGE_KEY_SHIFT
+            keys = (base | neighbor for neighbor in neighbors)
+        else:
+            keys = ((neighbor << _EDGE_KEY_SHIFT) | nid for neighbor in neighbors)
+        slots = np.fromiter(
+            (edge_id[key] for key in keys), dtype=np.int64, count=len(neighbors)
+        )
+        return self._weights_arr[slots]
+
+    def _build_cum_weights(self, nid):
+        """Computes and caches the search array for weighted draws from
+        `nid`, returning a (running maximum of the cumulative edge weights,
+        neighbors, weighted degree) tuple.
+
+        `weighted_choice` picks the first neighbor whose cumulative weight
+        reaches the draw. Attackers add negative ratings, which make the
+        cumulative weights decrease, so the binary search runs over their
+        running maximum instead: it first reaches any value at the same
+        index. Without negative weights the two arrays are equal.
+        """
+        if self._csr is not None:
+            # The node's neighbors and edge weights are already contiguous in
+            # the CSR arrays, so slice them instead of looking up each edge.
+            indptr, indices, weights = self._csr
+            lo, hi = indptr.item(nid), indptr.item(nid + 1)
+            neighbors = indices[lo:hi].tolist()
+            edge_weights = weights[lo:hi]
+        else:
+            neighbors = self.get_neighbors_by_id(nid)
+            edge_weights = self._neighbor_weights(nid, neighbors)
+        if not neighbors:
+            raise ValueError("Node has no neighbors")
+        cum_weights = np.cumsum(edge_weights)
+        total = cum_weights.item(-1)
+        np.maximum.accumulate(cum_weights, out=cum_weights)
+        cached = (cum_weights, neighbors, total)
+        self._cum_weight_cache[nid] = cached
+        return cached
 
     def add_edge(self, nid1, nid2, weight=1):
         """Adds an edge between nodes with IDs `nid1` and `nid2`.
 
         :param - weight: (default 1), specifies a weight for the edge
         """
-        assert self.nid_is_entity(nid1) != self.nid_is_entity(nid2)
-        self._weights[self._order_ei(nid1, nid2)] = weight
-        res = self._G.AddEdge(nid1, nid2)
-        assert res == -1, res
+        added = self.try_add_edge(nid1, nid2, weight)
+        assert added, (nid1, nid2)
+
+    def try_add_edge(self, nid1, nid2, weight=1):
+        """Adds an edge between nodes with IDs `nid1` and `nid2` unless it
+        already exists, in which case its weight is left untouched.
+
+        This does a single lookup in the underlying graph, so callers should
+        prefer it to checking `is_edge` before calling `add_edge`.
+
+        :param - weight: (default 1), specifies a weight for the edge
+        :return: whether the edge was added.
+        """
+        assert (nid1 & 1) != (nid2 & 1)
+        # TUNGraph.AddEdge returns -1 for a new edge and -2 if it existed.
+        if self._G.AddEdge(nid1, nid2) != -1:
+            return False
+        self._set_weight(nid1, nid2, weight)
+        return True
 
     def del_edge(self, nid1, nid2):
         """Removes an edge between nodes with IDs `nid1` and `nid2`."""
-        assert self.nid_is_entity(nid1) != self.nid_is_entity(nid2)
-        del self._weights[self._order_ei(nid1, nid2)]
+        assert (nid1 & 1) != (nid2 & 1)
+        slot = self._edge_id.pop(self._edge_key(nid1, nid2))
+        self._free_slots.append(slot)
+        self._weight_sum[nid1] -= self._weights_arr[slot]
+        self._weight_sum[nid2] -= self._weights_arr[slot]
         self._G.DelEdge(nid1, nid2)
+        self._cum_weight_cache.pop(nid1, None)
+        self._cum_weight_cache.pop(nid2, None)
+        self._csr = None
+
+    def freeze(self):
+        """Returns a CSR snapshot of the graph's adjacency as a tuple of
+        numpy arrays (indptr, indices, weights), building it if needed.
+
+        The neighbors of the node with ID `nid` are
+        `indices[indptr[nid]:indptr[nid + 1]]`, and `weights` holds the
+        weights of the corresponding edges. The snapshot is reused until the
+        graph is next modified.
+        """
+        if self._csr is not None:
+            return self._csr
+
+        max_nid = max(2 * self.num_entities - 1, 2 * self.num_items, 0)
+        degrees = np.zeros(max_nid + 1, dtype=np.int64)
+        for node in self._G.Nodes():
+            degrees[node.GetId()] = node.GetDeg()
+        indptr = np.zeros(max_nid + 2, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        weights = np.empty(indptr[-1], dtype=np.float64)
+        for node in self._G.Nodes():
+            nid = node.GetId()
+            lo, hi = indptr[nid], indptr[nid + 1]
+            if lo == hi:
+                continue
+            neighbors = list(node.GetOutEdges())
+            indices[lo:hi] = neighbors
+            weights[lo:hi] = self._neighbor_weights(nid, neighbors)
+
+        # Weighted draws search the running maximum of each node's
+        # cumulative weights (see `_build_cum_weights`), which only differs
+        # for the nodes with a negative edge weight.
+        cum_weights = np.cumsum(weights)
+        max_cum_weights = cum_weights
+        negative = np.flatnonzero(weights < 0)
+        if len(negative):
+            max_cum_weights = cum_weights.copy()
+            nids = np.unique(np.searchsorted(indptr, negative, side='right') - 1)
+            for nid in nids.tolist():
+                lo, hi = indptr[nid], indptr[nid + 1]
+                np.maximum.accumulate(cum_weights[lo:hi], out=max_cum_weights[lo:hi])
+
+        self._csr = (indptr, indices, weights)
+        self._csr_cum_weights = cum_weights
+        self._csr_max_cum_weights = max_cum_weights
+        return self._csr
 
     def is_edge(self, nid1, nid2):
         """Returns whether there is an edge between nodes with IDs `nid1`
@@ -101,7 +303,7 @@ class EIGraph(object):
     def get_edge_weight(self, nid1, nid2):
         """Return the weight of the edge connected `nid1` and `nid2`."""
         assert self.is_edge(nid1, nid2)
-        return self._weights[self._order_ei(nid1, nid2)]
+        return self._weights_arr[self._edge_id[self._edge_key(nid1, nid2)]]
 
     def get_items(self):
         """Returns a set containing the nodeIds
@@ -109,7 +311,7 @@ class EIGraph(object):
 
         :return: set containing item nodes
         """
-        return set(self.items)
+        return set(self.iter_items())
 
     def get_entities(self):
         """Returns a set containing the nodeIds
@@ -117,15 +319,43 @@ class EIGraph(object):
 
         :return: set containing entity nodes
         """
-        return set(self.entities)
+        return set(self.iter_entities())
+
+    def iter_items(self):
+        """Returns an xrange over the nodeIds of the items in this graph.
+
+        Prefer this to `get_items` when a set is not needed; it does not
+        allocate anything per item.
+        """
+        return xrange(2, 2 * self.num_items + 1, 2)
+
+    def iter_entities(self):
+        """Returns an xrange over the nodeIds of the entities in this graph.
+
+        Prefer this to `get_entities` when a set is not needed; it does not
+        allocate anything per entity.
+        """
+        return xrange(1, 2 * self.num_entities, 2)
 
     def get_neighbors(self, node):
         """Returns a list containing the node IDs of the neighbors
         of "node".
         """
         if isinstance(node, int):
-            node = self._G.GetNI(node)
-        return list(node.GetOutEdges())
+            return self.get_neighbors_by_id(node)
+        return self.get_neighbors_by_ni(node)
+
+    def get_neighbors_by_id(self, nid):
+        """Returns a list containing the node IDs of the neighbors
+        of the node with ID `nid`.
+        """
+        return list(self._G.GetNI(nid).GetOutEdges())
+
+    def get_neighbors_by_ni(self, ni):
+        """Returns a list containing the node IDs of the neighbors
+        of the snap node `ni`.
+        """
+        return list(ni.GetOutEdges())
 
     def get_random_edge(self):
         """Returns a random (entity, item, weight) pair whose edge
@@ -138,14 +368,17 @@ class EIGraph(object):
         while self._G.GetNI(item).GetOutDeg() == 0:
             [item] = self.get_random_items(1)
 
-        entity = self.get_random_neighbor(item).GetId()
+        entity = self.get_random_neighbor_by_id(item).GetId()
         return (entity, item, self.get_edge_weight(entity, item))
 
     def get_random_items(self, N, replace = True, excluding = None):
         """Returns a np.array of items in the graph"""
         if self.num_items == 0:
             raise ValueError("Graph has no items")
-        return np.random.choice([i for i in self.get_items() if i != excluding], N, replace)
+        items = np.arange(2, 2 * self.num_items + 1, 2)
+        if excluding is not None:
+            items = items[items != excluding]
+        return np.random.choice(items, N, replace)
 
     def get_random_neighbor(self, node, use_weights=False):
         """Returns a random neighbor of node in this graph as a Snap Node.
@@ -153,44 +386,114 @@ class EIGraph(object):
         :param Node: can be a snap node or an int ID.
         :param use_weights: If true, weighs the random choice based on the
             weight of the edge between the current node and its neighbors.
-            WARNING: This makes the code many times slower.
+            The cumulative weights of each node are cached between calls, so
+            a draw costs O(log degree) once they have been built.
+
+        Hot loops that know what kind of node they hold should call
+        `get_random_neighbor_by_id` or `get_random_neighbor_by_ni` instead.
         """
-        neighbors = self.get_neighbors(node)
-        if not neighbors:
-            raise ValueError("Node has no neighbors")
+        if isinstance(node, int):
+            return self.get_random_neighbor_by_id(node, use_weights)
+        return self.get_random_neighbor_by_ni(node, use_weights)
+
+    def get_random_neighbor_by_id(self, nid, use_weights=False):
+        """Same as `get_random_neighbor`, for a node given by its ID."""
+        if use_weights:
+            return self._get_weighted_random_neighbor(nid)
+        return self._get_uniform_random_neighbor(self._G.GetNI(nid))
+
+    def get_random_neighbor_by_ni(self, ni, use_weights=False):
+        """Same as `get_random_neighbor`, for a node given as a snap node."""
+        if use_weights:
+            return self._get_weighted_random_neighbor(ni.GetId())
+        return self._get_uniform_random_neighbor(ni)
+
+    def _get_weighted_random_neighbor(self, nid):
+        cached = self._cum_weight_cache.get(nid)
+        if cached is None:
+            cached = self._build_cum_weights(nid)
+        max_cum_weights, neighbors, total = cached
+
+        # Same draw as `weighted_choice`, done by binary search, including
+        # for nodes with negative edge weights.
+        draw = np.searchsorted(max_cum_weights, random.random() * total)
+        return self._G.GetNI(neighbors[min(draw, len(neighbors) - 1)])
+
+    def weighted_random_walk(self, nid, num_hops):
+        """Returns the IDs of the nodes visited by a random walk of
+        `num_hops` hops from `nid`, where each hop moves to a neighbor
+        drawn as `get_random_neighbor(..., use_weights=True)` does.
+
+        If the graph is frozen and numba is installed, the walk runs as a
+        compiled kernel over the CSR arrays.
+
+        :raises ValueError: if `nid` is not in the graph, or the walk reaches
+            a node with no neighbors.
+        """
+        # The kernel does no bounds checking, so reject unknown ids up front.
+        if not self._G.IsNode(nid):
+            raise ValueError("Node %d is not in the graph" % nid)
+
+        if self._csr is not None and HAVE_NUMBA:
+            indptr, indices, _ = self._csr
+            walk = np.empty(num_hops, dtype=np.int64)
+            hops = weighted_walk(
+                indptr, indices, self._csr_cum_weights,
+                self._csr_max_cum_weights, nid, np.random.random(num_hops), walk
+            )
+            if hops < num_hops:
+                raise ValueError("Node has no neighbors")
+            return walk.tolist()
+
+        walk = []
+        node = self._G.GetNI(nid)
+        for _ in xrange(num_hops):
+            node = self.get_random_neighbor_by_ni(node, use_weights=True)
+            walk.append(node.GetId())
+        return walk
+
+    def get_random_neighbor_fast(self, node):
+        """Returns a uniformly random neighbor of node as a Snap Node,
+        reading a single neighbor ID instead of listing all of them.
+        Reads the CSR snapshot directly if the graph is frozen.
 
-        if not use_weights:
-            return self._G.GetNI(random.choice(neighbors))
+        :param Node: can be a snap node or an int ID.
+        """
+        if self._csr is None:
+            if isinstance(node, int):
+                node = self._G.GetNI(node)
+            return self._get_uniform_random_neighbor(node)
 
-        weights = []
         if not isinstance(node, int):
             node = node.GetId()
+        indptr, indices, _ = self._csr
+        lo, hi = indptr.item(node), indptr.item(node + 1)
+        if lo == hi:
+            raise ValueError("Node has no neighbors")
+        return self._G.GetNI(indices.item(lo + random.randrange(hi - lo)))
 
-        weight_sum = 0.0
-        for neighbor in neighbors:
-            curr_edge_weight = self.get_edge_weight(node, neighbor)
-            weight_sum += curr_edge_weight
-            weights.append(curr_edge_weight)
-
-        draw = weighted_choice(neighbors, weights, weight_sum)
-        return self._G.GetNI(draw)
+    def _get_uniform_random_neighbor(self, ni):
+        deg = ni.GetDeg()
+        if deg == 0:
+            raise ValueError("Node has no neighbors")
+        return self._G.GetNI(ni.GetNbrNId(random.randrange(deg)))
 
     def get_average_edge_weight(self, node):
-        neighbors = self.get_neighbors(node)
-        if len(neighbors) == 0:
+        if isinstance(node, int):
+            node = self._G.GetNI(node)
+        degree = node.GetDeg()
+        if degree == 0:
             raise ValueError("Zero degree node has no average edge weight")
-
-        weights = [self.get_edge_weight(n, node) for n in neighbors]
-        return sum(weights) * 1.0 / len(weights)
+        return self._weight_sum[node.GetId()] / degree
 
     def has_entity(self, entity_id):
         """Returns whether the graph contains the given `entity_id`."""
-        assert self.nid_is_entity(entity_id)
+        assert entity_id >= 1 and entity_id & 1
         return self._G.IsNode(entity_id)
 
     def has_item(self, item_id):
         """Returns whether the graph contains the given `item_id`."""
-        assert self.nid_is_item(item_id)
+        assert item_id >= 2 and not item_id & 1
         return self._G.IsNode(item_id)
 
     def has_node(self, node_id):
@@ -206,14 +509,26 @@ class EIGraph(object):
 
         In order to store metadata associated with this the EIGraph
         object, we save an extra file, with the name `filename + '.ei_meta'`.
+        It is an .npz archive holding the edge weights as three parallel
+        arrays: `entities`, `items` and `weights`.
         """
         FOut = snap.TFOut(filename)
         self.base().Save(FOut)
         FOut.Flush()
         meta_fn = self._get_meta_filename(filename)
 
+        num_edges = len(self._edge_id)
+        keys = np.fromiter(self._edge_id.iterkeys(), dtype=np.int64, count=num_edges)
+        slots = np.fromiter(self._edge_id.itervalues(), dtype=np.int64, count=num_edges)
+
+        # Pass a file object so that numpy does not append '.npz'.
         with open(meta_fn, 'wb') as fout:
-            marshal.dump(self._weights, fout)
+            np.savez(
+                fout,
+                entities=keys >> _EDGE_KEY_SHIFT,
+                items=keys & _ITEM_MASK,
+                weights=self._weights_arr[slots],
+            )
 
     @staticmethod
     def load(filename):
@@ -228,18 +543,32 @@ class EIGraph(object):
         for node in G.Nodes():
             if EIGraph.nid_is_entity(node.GetId()):
                 graph.num_entities += 1
-                graph.entities.append(node.GetId())
             else:
                 assert EIGraph.nid_is_item(node.GetId())
                 graph.num_items += 1
-                graph.items.append(node.GetId())
 
         with open(EIGraph._get_meta_filename(filename), 'rb') as fin:
-            graph._weights = marshal.load(fin)
-            ratings_set = set()
-            for k, v in graph._weights.items():
-                ratings_set.add(v)
-            possible_ratings = sorted(list(ratings_set))
+            is_npz = fin.read(len(_NPZ_MAGIC)) == _NPZ_MAGIC
+            fin.seek(0)
+            if is_npz:
+                meta = np.load(fin)
+                entities, items, weights = \
+                    meta['entities'], meta['items'], meta['weights']
+            else:
+                # Older graphs stored an (entity, item) -> weight marshal dict.
+                legacy_weights = marshal.load(fin)
+                num_edges = len(legacy_weights)
+                entities = np.fromiter(
+                    (e for e, _ in legacy_weights.iterkeys()), np.int64, num_edges
+                )
+                items = np.fromiter(
+                    (i for _, i in legacy_weights.iterkeys()), np.int64, num_edges
+                )
+                weights = np.fromiter(
+                    legacy_weights.itervalues(), np.float64, num_edges
+                )
+            graph._load_weights(entities, items, weights)
+            possible_ratings = np.unique(weights).tolist()
 
         # Setup the graph with the range of possible ratings.
         graph.rating_range = (1, 5)
@@ -261,14 +590,11 @@ class EIGraph(object):
         """
         The weighted degree of an item is the sum of weights over its edges.
         """
-        return sum(
-            self._weights[self._order_ei(other_nid, nid)]
-            for other_nid in self.get_neighbors(nid)
-        )
+        return self._weight_sum.get(nid, 0.0)
 
     def get_weighted_item_to_degree(self):
         """Returns a map of item to weighted degree."""
         node_to_degree = defaultdict(int)
-        for iid in self.get_items():
+        for iid in self.iter_items():
             node_to_degree[iid] += self.get_weighted_degree(iid)
         return node_to_degree
@@ -1,6 +1,7 @@
 """Utlities for probability/math operations"""
 
 import random
+import numpy as np
 
 def weighted_choice(seq, weights, weight_sum):
     """https://scaron.info/blog/python-weighted-choice.html
@@ -14,3 +15,33 @@ def weighted_choice(seq, weights, weight_sum):
             return elmt
         x -= weights[i]
     # Not reached.
+
+def sample_bernoulli_indices(n, p):
+    """Returns a sorted np.array with the indices in [0, n) that succeed in
+    n independent Bernoulli(p) trials.
+
+    Uses geometric skipping (Batagelj & Brandes, 2005): the gaps between
+    successes are drawn directly, in vectorized batches, so this takes
+    O(n * p) time instead of O(n).
+    """
+    if n <= 0 or p <= 0:
+        return np.empty(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(n, dtype=np.int64)
+
+    log_q = np.log1p(-p)
+    expected = n * p
+    batch_size = int(expected + 3 * np.sqrt(expected)) + 1
+
+    batches = []
+    last = -1
+    while last < n:
+        gaps = np.floor(np.log1p(-np.random.random(batch_size)) / log_q)
+        # Clip so that huge gaps cannot overflow int64.
+        gaps = np.minimum(gaps, n).astype(np.int64) + 1
+        indices = last + np.cumsum(gaps)
+        batches.append(indices)
+        last = indices[-1]
+
+    indices = np.concatenate(batches)
+    return indices[:np.searchsorted(indices, n)]
@@ -0,0 +1,58 @@
+"""Utilities for random walks over CSR adjacency arrays (see `EIGraph.freeze`).
+
+The kernels are compiled with numba when it is installed. numba is
+optional: `HAVE_NUMBA` says whether it is available, and callers should
+fall back to walking the SNAP graph otherwise, since the uncompiled kernels
+are slower than that.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for `numba.njit` that leaves the function as is."""
+        return lambda func: func
+
+@njit(cache=True)
+def _weighted_step(indptr, indices, cum_weights, max_cum_weights, nid, u):
+    """Returns a neighbor of `nid` drawn as `weighted_choice` would, using
+    the uniform sample `u`, or -1 if `nid` has no neighbors.
+    """
+    lo = indptr[nid]
+    hi = indptr[nid + 1]
+    if lo == hi:
+        return -1
+    base = cum_weights[lo - 1] if lo > 0 else 0.0
+    x = base + u * (cum_weights[hi - 1] - base)
+    k = lo + np.searchsorted(max_cum_weights[lo:hi], x)
+    return indices[min(k, hi - 1)]
+
+@njit(cache=True)
+def weighted_walk(indptr, indices, cum_weights, max_cum_weights, start,
+        uniforms, out):
+    """Takes a weighted random walk of `len(out)` hops from node `start`,
+    writing the visited node IDs to `out`. `start` must be a valid index
+    into `indptr[:-1]`; it is not checked.
+
+    :param cum_weights: the cumulative sum of the CSR edge weights.
+    :param max_cum_weights: the running maximum of `cum_weights` over each
+        node's edges, which the draws search so that negative weights are
+        handled as in `weighted_choice`.
+    :param uniforms: `len(out)` samples from U[0, 1), one per hop.
+    :returns: the number of hops taken; fewer than `len(out)` means the
+        walk reached a node with no neighbors.
+    """
+    cur = start
+    for k in range(out.shape[0]):
+        cur = _weighted_step(
+            indptr, indices, cum_weights, max_cum_weights, cur, uniforms[k]
+        )
+        if cur < 0:
+            return k
+        out[k] = cur
+    return out.shape[0]
@@ -1,3 +1,7 @@
 #! /bin/bash
 
+set -e
+
 python gbra/tests/test_ei_graph.py
+python gbra/tests/test_math_utils.py
+python gbra/tests/test_network_loader.py